@@ -6,6 +6,54 @@ let CommitValidator
 let Result
 let Status
 
+// Compiled once at import, rather than each time a validator class is created.
+const rx_parser = /^(.*): (.*)$/
+const rx_whitespace = /\s/
+const rx_parens = /[()]/
+
+const category_alnum = new Set('abcdefghijklmnopqrstuvwxyz0123456789')
+const category_separators = new Set('_|-/')
+const description_first_chars = new Set('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+const description_last_chars_banned = new Set('.!?,')
+
+// The category and description rules are plain character checks,
+// so a single scan is enough and avoids regex backtracking on long titles.
+// A category is made of runs of at least 2 lowercase letters or numbers,
+// each optionally followed by a single separator, e.g. 'libdonet/dcparser'.
+// It may end with a non-empty '(scope)', e.g. 'docs(readme)'.
+function is_valid_category(category) {
+    const scope_start = category.indexOf('(')
+    if (scope_start !== -1) {
+        const scope = category.slice(scope_start + 1, -1)
+        if (!category.endsWith(')') || scope.length === 0 || rx_parens.test(scope)) {
+            return false
+        }
+        category = category.slice(0, scope_start)
+    }
+    let run = 0
+    for (const c of category) {
+        if (category_alnum.has(c)) {
+            run++
+        } else if (category_separators.has(c) && run >= 2) {
+            run = 0
+        } else {
+            return false
+        }
+    }
+    return category.length >= 2 && (run === 0 || run >= 2)
+}
+
+function is_valid_description(description) {
+    if (description.length < 3) {
+        return false
+    }
+    const last = description[description.length - 1]
+    return description_first_chars.has(description[0])
+        && !description_last_chars_banned.has(last)
+        && !rx_whitespace.test(last)
+        && rx_whitespace.test(description.slice(1, -1))
+}
+
 export function import_types(commitValidatorCls, commitCls, resultCls, statusCls) {
     CommitValidator = commitValidatorCls
     Commit = commitCls
@@ -15,26 +63,23 @@ export function import_types(commitValidatorCls, commitCls, resultCls, statusCls
 
 export function createValidator() {
     return class Validator extends CommitValidator {
-        static rx_parser = new RegExp('^(.*): (.*)$')
-        static rx_category = new RegExp('^|(?:[a-z0-9]{2,}[_|-]?)+$')
-        static rx_description = new RegExp('^[A-Z0-9]\\S*(?:\\s\\S*)+[^.!?,\\s]$')
-
         validate_message(summary, _description) {
-            const match = Validator.rx_parser.exec(summary)
+            const match = rx_parser.exec(summary)
             if (match === null) {
                 return new Result(
                     Status.Failure,
                     'Commit summary has invalid format. It should be \'<category>: <Contribution Description>\''
                 )
             }
-            if (!Validator.rx_category.test(match[1])) {
+            if (!is_valid_category(match[1])) {
                 return new Result(
                     Status.Failure,
                     "Invalid category tag. It should be completely lowercase " +
-                    "letters or numbers, at least 2 characters long, other allowed characters are: '|', '-' and '_'."
+                    "letters or numbers, at least 2 characters long, other allowed characters are: '|', '-', '_' and '/'. " +
+                    "It may end with a '(scope)'."
                 )
             }
-            if (!Validator.rx_description.test(match[2])) {
+            if (!is_valid_description(match[2])) {
                 return new Result(
                     Status.Failure,
                     'Invalid description. It should start with an uppercase letter or number, ' +
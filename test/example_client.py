@@ -21,6 +21,7 @@ class SimpleClient(ShowBase):
         # FIXME: These values will be off the kilter if keys are pressed when the client starts.
         self.movement_heading = 0
         self.movement_speed = 0
+        self.movement_changed = False  # intent is sent at most once per server frame
         self.accept("avatar_ov", self.get_avatar)
         self.accept("distributed_avatar", self.get_distributed_avatar)
         self.accept("w", self.indicate_movement, [0, 1])
@@ -44,6 +45,8 @@ class SimpleClient(ShowBase):
                           host=CA_HOST, port=CA_PORT)
         # set task to poll datagrams every frame
         self.task_mgr.add(self.poll_datagrams, 'poll datagrams')
+        # set task to send our movement intent, if changed, every server frame
+        self.task_mgr.do_method_later(AI_DT, self.send_movement, 'send movement')
 
     def poll_datagrams(self, task):
         self.repo.poll_till_empty()
@@ -96,7 +99,7 @@ class SimpleClient(ShowBase):
     # Interface
     #
 
-    # Adjust current intention and send it.
+    # Adjust current intention; it is sent by `send_movement()`.
     def indicate_movement(self, heading, speed):
         if self.avatar_ov and self.avatar_ready:
             # FIXME: Not really graceful to just ignore this.
@@ -104,10 +107,17 @@ class SimpleClient(ShowBase):
 
             self.movement_heading += heading
             self.movement_speed += speed
-            self.avatar_ov.indicate_intent(self.movement_heading, self.movement_speed)
+            self.movement_changed = True
         else:
             print("Avatar not complete yet!")
 
+    # Send the latest intent, coalescing key events received since the last server frame.
+    def send_movement(self, task):
+        if self.movement_changed:
+            self.movement_changed = False
+            self.avatar_ov.indicate_intent(self.movement_heading, self.movement_speed)
+        return Task.again
+
     # A DistributedAvatarOV was created, here is it.
     def get_avatar(self, owner_view):
         print("Received DistributedAvatarOV in client")
@@ -115,13 +125,10 @@ class SimpleClient(ShowBase):
         self.taskMgr.add(self.complete_avatar, 'complete avatar')
 
     def complete_avatar(self, task):
-        try:
+        if self.avatar_ov.do_id in self.repo.distributed_objects:
             self.avatar_ready = True
             return Task.done
-        except KeyError:
-            print("Couldn't complete DistributedAvatarOV " + str(self.avatar_ov.do_id) + ", Available DOs: ".join(
-                [str(self.avatar_ov.do_id) for self.avatar_ov.do_id in self.repo.distributed_objects.keys()]))
-            return Task.cont
+        return Task.cont  # try again next frame
 
     # A DistributedAvatar was created, here is it.
     def get_distributed_avatar(self, avatar):
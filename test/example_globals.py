@@ -1,7 +1,9 @@
 VERSION_STRING = 'Donet Example v1.0'
 DC_FILE = 'example.dc'
 AI_FRAME_RATE = 30.0
+AI_DT = 1.0 / AI_FRAME_RATE  # seconds per server frame
 AI_TASKS = []
+DEBUG_LOGIN = False  # print every login attempt handled by the LoginManager
 
 # Network
 CA_HOST = "127.0.0.1"
@@ -1,5 +1,5 @@
 from astron.object_repository import InterestInternalRepository
-from time import sleep
+from time import monotonic, sleep
 from example_globals import *
 
 
@@ -17,11 +17,20 @@ class Services:
         self.ir.create_distobj("LoginManagerAI", LoginManagerId, RootID, LOGIN_ZONE, set_ai=True)
         self.ir.create_distobj("DistributedWorldAI", DistributedWorldId, RootID, WORLD_ZONE, set_ai=True)
 
+        next_frame = monotonic()
         while True:
             self.ir.poll_till_empty()
-            for i in range(len(AI_TASKS)):
-                AI_TASKS[i]()  # execute tasks per server frame
-            sleep(1.0 / float(AI_FRAME_RATE))
+            for task in AI_TASKS:
+                task()  # execute tasks per server frame
+
+            # Sleep until the next frame is due, minus the time spent on this one
+            next_frame += AI_DT
+            sleep_time = next_frame - monotonic()
+            if sleep_time > 0.0:
+                sleep(sleep_time)
+            else:
+                # We're running behind; drop the missed frames instead of rushing through them
+                next_frame = monotonic()
 
     def connection_failure(self):
         print("Connection failure! Is the Message Director up?")
@@ -1,7 +1,7 @@
 from astron.object_repository import DistributedObject
 from example_globals import *
+import itertools
 import numpy as np
-import random
 
 """
 Note: Your IDE may highlight errors on this file due to sections
@@ -12,6 +12,14 @@ sections only run on the Panda clients, and will not run in services.
 avatar_speed = 3.0
 avatar_rotation_speed = 90.0
 pos_float_accuracy = 3
+# Scale between float positions and the integers sent over the network
+pos_factor = 10 ** pos_float_accuracy
+pos_inv_factor = 1.0 / pos_factor
+# Heading is sent over the network in whole degrees, so we rotate by whole degrees too
+heading_cos = np.cos(np.radians(np.arange(360)))
+heading_sin = np.sin(np.radians(np.arange(360)))
+# Initial number of avatar slots on the AI; the pool grows when it runs out
+avatar_pool_size = 64
 __PANDA_RUNNING__ = False
 
 try:  # If base built-in is defined (running on client), import Panda classes
@@ -99,8 +107,9 @@ class LoginManagerAE(DistributedObject):
         self.add_ai_interest(RootID, WORLD_ZONE)
 
     def login(self, client_channel, username, password):
-        print("LoginManagerAE.login(" + username + ", <PASSWORD>) for %d in (%d, %d) for client %s" %
-              (self.do_id, self.parent, self.zone, str(client_channel)))
+        if DEBUG_LOGIN:
+            print("LoginManagerAE.login(%s, <PASSWORD>) for %d in (%d, %d) for client %s" %
+                  (username, self.do_id, self.parent, self.zone, client_channel))
 
         if (username == "guest") and (password == "guest"):
             # Authenticate a client
@@ -110,14 +119,16 @@ class LoginManagerAE(DistributedObject):
 
             # The client is now authenticated; create an Avatar
             self.world_view.create_avatar(client_channel)
-            print("Login successful (user: %s)" % (username,))
+            if DEBUG_LOGIN:
+                print("Login successful (user: %s)" % (username,))
 
         else:
             # Disconnect for bad auth
             # "122" is the magic number for login problems.
             # See https://github.com/Astron/Astron/blob/master/doc/protocol/10-client.md
             self.send_CLIENTAGENT_EJECT(client_channel, 122, "Bad credentials")
-            print("Ejecting client for bad credentials (user: %s)" % username)
+            if DEBUG_LOGIN:
+                print("Ejecting client for bad credentials (user: %s)" % (username,))
 
     def interest_distobj_ai_enter(self, view, do_id, parent_id, zone_id):
         if do_id == DistributedWorldId:
@@ -156,6 +167,9 @@ class DistributedWorldAE(DistributedObject):
 
 
 class DistributedWorldAI(DistributedObject):
+    # do_ids handed out to new avatars, in order, so no two avatars share one
+    avatar_doids = itertools.count(1500000)
+
     def init(self):
         print("DistributedWorldAI.init() for %d in (%d, %d)" % (self.do_id, self.parent, self.zone))
 
@@ -163,7 +177,9 @@ class DistributedWorldAI(DistributedObject):
         print("DistributedWorldAI.create_avatar(" + str(client_id) + ") for %d in (%d, %d)" %
               (self.do_id, self.parent, self.zone))
         # Create the avatar
-        avatar_doid = random.randint(1500000, 1599999)  # FIXME: Generate actual random channel for new do_id
+        avatar_doid = next(self.avatar_doids)
+        while avatar_doid in (LoginManagerId, DistributedWorldId):  # skip our static IDs
+            avatar_doid = next(self.avatar_doids)
         self.repo.create_distobj('DistributedAvatar', avatar_doid, self.do_id, 0)
         # Set the client to be interested in our zone 0. He can't do
         # that himself (or rather: shouldn't be allowed to) as he has
@@ -201,11 +217,8 @@ class DistributedAvatar(DistributedObject):
             self.model.remove_node()
 
     def set_xyzh(self, x, y, z, h):
-        divisor = float(pow(10, pos_float_accuracy))
-        float_x, float_y, float_z = float(x), float(y), float(z)
-        float_x, float_y, float_z = float_x / divisor, float_y / divisor, float_z / divisor,
         if __PANDA_RUNNING__:
-            self.model.set_pos(float_x, float_y, float_z)
+            self.model.set_pos(x * pos_inv_factor, y * pos_inv_factor, z * pos_inv_factor)
             self.model.set_h(h)
 
 
@@ -230,11 +243,8 @@ class DistributedAvatarOV(DistributedObject):
         self.send_update("indicate_intent", heading, speed)
 
     def set_xyzh(self, x, y, z, h):
-        divisor = float(pow(10, pos_float_accuracy))
-        float_x, float_y, float_z = float(x), float(y), float(z)
-        float_x, float_y, float_z = float_x / divisor, float_y / divisor, float_z / divisor,
         if __PANDA_RUNNING__:
-            self.model.set_pos(float_x, float_y, float_z)
+            self.model.set_pos(x * pos_inv_factor, y * pos_inv_factor, z * pos_inv_factor)
             self.model.set_h(h)
 
 
@@ -243,27 +253,99 @@ class DistributedAvatarAE(DistributedObject):
         print("DistributedAvatarAE.init() for %d in (%d, %d)" % (self.do_id, self.parent, self.zone))
 
 
+class AvatarPool:
+    """
+    Keeps the position and movement intent of every `DistributedAvatarAI`
+    in NumPy arrays (one per attribute, indexed by the avatar's slot),
+    so all avatars can be moved at once every server frame.
+    """
+    def __init__(self, size):
+        self.avatars = [None] * size
+        self.free_slots = list(range(size - 1, -1, -1))
+        self.xs, self.ys, self.zs, self.hs = np.zeros(size), np.zeros(size), np.zeros(size), np.zeros(size)
+        self.turns, self.forwards = np.zeros(size), np.zeros(size)
+        self.active = np.zeros(size, dtype=bool)
+
+    def claim(self, avatar):
+        if not self.free_slots:
+            self.grow()
+        if not self.active.any():
+            # First avatar; append `update_positions()` method to tasks (ran every 'server frame')
+            AI_TASKS.append(self.update_positions)
+        slot = self.free_slots.pop()
+        self.avatars[slot] = avatar
+        self.xs[slot], self.ys[slot], self.zs[slot], self.hs[slot] = 0.0, 0.0, 0.0, 0.0
+        self.turns[slot], self.forwards[slot] = 0.0, 0.0
+        self.active[slot] = True
+        return slot
+
+    def release(self, slot):
+        self.avatars[slot] = None
+        self.active[slot] = False
+        self.free_slots.append(slot)
+        if not self.active.any():
+            AI_TASKS.remove(self.update_positions)
+
+    def grow(self):
+        size = len(self.avatars)
+        self.avatars += [None] * size
+        self.free_slots += range(2 * size - 1, size - 1, -1)
+        for name in ('xs', 'ys', 'zs', 'hs', 'turns', 'forwards'):
+            setattr(self, name, np.concatenate((getattr(self, name), np.zeros(size))))
+        self.active = np.concatenate((self.active, np.zeros(size, dtype=bool)))
+
+    def update_positions(self):
+        moving = np.flatnonzero(self.active & ((self.turns != 0.0) | (self.forwards != 0.0)))
+        if moving.size == 0:
+            return
+
+        # Calculate new avatar headings (delta time is an estimate; one server frame)
+        hs = np.mod(self.hs[moving] + self.turns[moving] * avatar_rotation_speed * AI_DT, 360.0)
+        self.hs[moving] = hs
+
+        # Rotate our avatars' local forward movement by their heading (Z-axis).
+        # Only X and Y are affected, so there is no need for a full 4x4 matrix.
+        int_hs = hs.astype(int)  # truncated, exactly as sent over the network
+        h_degrees = int_hs % 360
+        local_y = -1.0 * avatar_speed * self.forwards[moving] * AI_DT
+        xs = self.xs[moving] + np.round(-1.0 * heading_sin[h_degrees] * local_y, pos_float_accuracy)
+        ys = self.ys[moving] + np.round(heading_cos[h_degrees] * local_y, pos_float_accuracy)
+
+        # limit x and y coords to (-10 < n < 10)
+        np.clip(xs, -10.0, 10.0, out=xs)
+        np.clip(ys, -10.0, 10.0, out=ys)
+        self.xs[moving], self.ys[moving] = xs, ys
+
+        # Convert positions to integers to send over the network in a smaller data type
+        int_xs = (xs * pos_factor).astype(int).tolist()
+        int_ys = (ys * pos_factor).astype(int).tolist()
+        int_zs = (self.zs[moving] * pos_factor).astype(int).tolist()
+        int_hs = int_hs.tolist()
+        for slot, xyzh in zip(moving.tolist(), zip(int_xs, int_ys, int_zs, int_hs)):
+            self.avatars[slot].send_xyzh(xyzh)
+
+
 class DistributedAvatarAI(DistributedObject):
     def init(self):
         print("DistributedAvatarAI.init() for %d in (%d, %d)" % (self.do_id, self.parent, self.zone))
         """
         Since we don't have a Panda `NodePath` object as a Panda3D independent service,
-        we have to define our own x, y, z, and h variables to keep track of.
+        we have to keep track of our own x, y, z, and h. These, along with the heading
+        and speed intent, live in our slot of the `avatar_pool`.
         """
-        self.x, self.y, self.z, self.h = 0.0, 0.0, 0.0, 0.0
-        """
-        Heading and speed are kept in a range of -1 to 1. (-1 <= n <= 1)
-        This value is sent by the client, and is checked to be in range to prevent cheating.
-        """
-        self.turn, self.forward = 0, 0
-        # Append `update_position()` method to tasks (ran every 'server frame')
-        AI_TASKS.append(self.update_position)
+        self.slot = avatar_pool.claim(self)
+        # Last (x, y, z, h) sent over the network, so unchanged positions aren't resent
+        self.last_xyzh = None
 
     def delete(self):
         print("DistributedAvatarAI.delete() for %d in (%d, %d)" % (self.do_id, self.parent, self.zone))
-        AI_TASKS.remove(self.update_position)
+        avatar_pool.release(self.slot)
 
     def indicate_intent(self, client_channel, turn, forward):
+        """
+        Heading and speed are kept in a range of -1 to 1. (-1 <= n <= 1)
+        This value is sent by the client, and is checked to be in range to prevent cheating.
+        """
         if (turn < -1.0) or (turn > 1.0) or (forward < -1.0) or (forward > 1.0):
             """
             The client is cheating! It has sent a heading or speed that is not in its programmed range.
@@ -271,52 +353,14 @@ class DistributedAvatarAI(DistributedObject):
             """
             self.send_CLIENTAGENT_EJECT(client_channel, 152, "Argument values out of range.")
             return
-        self.turn, self.forward = turn, forward
-
-    def update_position(self):
-        if (self.turn != 0.0) or (self.forward != 0.0):
-            # Get delta time (an estimate)
-            dt = 1.0 / float(AI_FRAME_RATE)
-
-            # Calculate new avatar heading
-            degrees = 360.0
-            if self.turn < 0:
-                degrees *= -1.0
-            h_added = (self.turn * avatar_rotation_speed * dt) % degrees
-            if (self.h + h_added) >= 360.0:
-                self.h = (self.h + h_added) - 360.0
-            elif (self.h + h_added) < 0.0:
-                self.h = (self.h + h_added) + 360.0
-            else:
-                self.h += h_added
-
-            # Apply Z-axis Euler angle 4x4 matrix rotation to our avatar's matrix
-            h_rads = np.radians(self.h)
-            rotation_matrix = np.array([[np.cos(h_rads), -1 * np.sin(h_rads), 0.0, 0.0],
-                                        [np.sin(h_rads), np.cos(h_rads), 0.0, 0.0],
-                                        [0.0, 0.0, 1.0, 0.0],
-                                        [0.0, 0.0, 0.0, 1.0]])
-
-            local_vec = np.array([0.0, -1.0 * avatar_speed * self.forward * dt, 0.0, 1.0])
-            global_vec = np.matmul(rotation_matrix, local_vec)
-
-            self.x += np.round(global_vec[0], pos_float_accuracy)
-            self.y += np.round(global_vec[1], pos_float_accuracy)
-            self.z += np.round(global_vec[2], pos_float_accuracy)
-
-            # limit x coord to (-10 < x < 10)
-            if self.x < -10.0:
-                self.x = -10.0
-            if self.x > 10.0:
-                self.x = 10.0
-            # limit y coord to (-10 < y < 10)
-            if self.y < -10.0:
-                self.y = -10.0
-            if self.y > 10.0:
-                self.y = 10.0
-
-            # Convert positions to integers to send over the network in a smaller data type
-            factor = pow(10, pos_float_accuracy)
-            int_x, int_y, int_z = int(self.x * factor), int(self.y * factor), int(self.z * factor)
-            # Send positions over the network
-            self.send_update('set_xyzh', int_x, int_y, int_z, int(self.h))
\ No newline at end of file
+        avatar_pool.turns[self.slot], avatar_pool.forwards[self.slot] = turn, forward
+
+    def send_xyzh(self, xyzh):
+        if xyzh == self.last_xyzh:
+            return  # e.g. pushing against the map boundary; peers already have this position
+        self.last_xyzh = xyzh
+        # Send positions over the network
+        self.send_update('set_xyzh', *xyzh)
+
+
+avatar_pool = AvatarPool(avatar_pool_size)